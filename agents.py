@@ -15,7 +15,6 @@ class Dog(mesa.Agent):
         self.bred = bred
         self.health_status = health_status
         self.location = location
-        self.pos = location  # Position in the grid
         self.reproductive_status = reproductive_status
         self.aggression_level = aggression_level
         self.pack = []  # Pack members
@@ -28,6 +27,9 @@ class Dog(mesa.Agent):
 
     def step(self):
         """Advance the model by one step (which represents a month)."""
+        if self.pos is None:
+            return  # Adopted earlier in this step
+
         self.age += 1  # Increment age by 1 day
 
         self.day_count += 1 # Increment the day count
@@ -42,12 +44,15 @@ class Dog(mesa.Agent):
         if self.hunger >= 200:
             print("The dog has died.")
             self.remove()
+            return
 
         # Set reproductive status based on age
         if self.age >= 730:  # 2 years = 24 months
             self.reproductive_status = "active"
 
         self.check_lifespan()  # Check if the dog dies
+        if self.pos is None:
+            return
         self.reproduce()  # Check for reproduction
         self.move()  # Move
         self.interact_with_nearby_agents()  # Interact with others
@@ -267,6 +272,11 @@ class Dog(mesa.Agent):
     def calculate_distance(self, other_location):
         return math.sqrt((self.location[0] - other_location[0]) ** 2 + (self.location[1] - other_location[1]) ** 2)
 
+    def remove(self):
+        """Remove the dog from the model and the grid."""
+        self.model.grid.remove_agent(self)
+        super().remove()
+
     def adopt(self):
         self.remove()
 
@@ -310,15 +320,26 @@ class Human(mesa.Agent):
         self.sex = sex
         self.attitude_towards_dogs = attitude_towards_dogs
         self.location = location
-        self.pos = location
         self.rabid = False
         self.health_status = "healthy"
         self.rabies_duration = 0  # Tracks how long the human has been infected
         self.previous_money_spent = 0
 
     def step(self):
+        self.act()
+        self.check_mortality()
+
+    def act(self):
+        """Everything a human does in a step before its mortality check.
+
+        The vectorized dog population steps between ``act`` and the mortality
+        check: which humans die is drawn first, and as with agents stepped in
+        random order, the dogs meet those humans half of the time.
+        """
         self.age += 1
         self.check_rabies()
+        if self.pos is None:
+            return  # Died of rabies
         self.move()  # Humans move every step
         self.interact_with_nearby_dogs()
 
@@ -331,22 +352,31 @@ class Human(mesa.Agent):
             self.previous_money_spent = self.model.attitude_spending
         else:
             self.previous_money_spent = self.model.attitude_spending
-        
+
+    def check_mortality(self):
+        if self.pos is None:
+            return  # Died of rabies
+        if self.dies():
+            self.remove()
+
+    def dies(self):
         if self.age <= 7200:
-            if random.random() < 0.4:
-                self.remove()
+            return random.random() < 0.4
         elif self.age <= 14400:
-            if random.random() < 0.8:
-                self.remove()
+            return random.random() < 0.8
         elif self.age > random.randint(14400, 36500):
-            self.remove()
+            return True
 
         # Age-related mortality risk
         elif self.age > 900:  
-            if random.random() < 0.1:
-                self.remove()
+            return random.random() < 0.1
+        return False
+
+    def remove(self):
+        """Remove the human from the model and the grid."""
+        self.model.grid.remove_agent(self)
+        super().remove()
 
-        
     def make_decision(self, dog):
         if dog.adoptability > 0.5 and self.attitude_towards_dogs > 0.7:
             dog.adopt()
@@ -402,6 +432,10 @@ class Human(mesa.Agent):
             self.model.grid.move_agent(self, new_position)
 
     def interact_with_nearby_dogs(self):
+        # The vectorized dog population handles human-dog encounters in bulk
+        if self.model.dog_population is not None:
+            return
+
         neighbors = self.model.grid.get_neighbors(self.pos, moore=True, include_center=False, radius=1)
 
         for neighbor in neighbors:
@@ -12,6 +12,7 @@ parser.add_argument("--dog_population_size", type=int, default=10, help="Initial
 parser.add_argument("--human_population_size", type=int, default=30, help="Initial human population (default: 30)")
 parser.add_argument("--initial_money", type=int, default=1000, help="Initial budget (default 1000)")
 parser.add_argument("--num_of_episodes", type=int, default=2, help="Number of training episodes")
+parser.add_argument("--vectorized", action="store_true", help="Simulate dogs with the vectorized NumPy population engine")
 
 
 args = parser.parse_args()
@@ -28,7 +29,8 @@ model = DogHumanModel(
     vaccination_rate=0.2, 
     weekly_kill_rate=0.05, 
     initial_money=1000, 
-    seed=None
+    seed=None,
+    vectorized=args.vectorized
 )
 
 df = pd.read_csv("simulation_results.csv")
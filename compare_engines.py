@@ -0,0 +1,118 @@
+import argparse
+import math
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+ENGINES = ["agents", "vectorized"]
+
+# Trajectories compared between the engines, as (name, model method)
+METRICS = [("dogs", "return_the_dog_agents"), ("rabid_dogs", "return_the_rabid_dog_agents"),
+           ("vaccinated_dogs", "return_the_vaccinated_dog_agents")]
+
+
+def run_engine(job):
+    """Run one seeded model of an engine; return its per-step metric trajectories.
+
+    With adults=True the initial dogs are given adult ages (730 to 1800 days)
+    and are reproductively active, so they breed from the first step;
+    otherwise no dog reaches breeding age within a short run.
+    """
+    from agents import Dog
+    from model import DogHumanModel
+
+    model = DogHumanModel(width=job["width"], height=job["height"], num_dogs=job["dogs"], num_humans=job["humans"],
+                          num_of_episodes=0, neutering_rate=0.1, vaccination_rate=0.2, weekly_kill_rate=0.05,
+                          initial_money=10 ** 12, seed=job["seed"], vectorized=job["engine"] == "vectorized")
+    # The same fixed policy on both engines, and no bankruptcy resets
+    model.rl_agent.epsilon = 0
+    model.rl_agent.q_table = np.zeros_like(model.rl_agent.q_table)
+
+    if job["adults"]:
+        ages = np.random.default_rng(job["seed"]).integers(730, 1801, job["dogs"])
+        if model.dog_population is not None:
+            model.dog_population.age[:] = ages
+            model.dog_population.active[:] = True
+        else:
+            for dog, age in zip([agent for agent in model.agents if isinstance(agent, Dog)], ages.tolist()):
+                dog.age = age
+                dog.reproductive_status = "active"
+
+    trajectories = {name: [] for name, _ in METRICS}
+    for _ in range(job["steps"]):
+        model.step()
+        for name, method in METRICS:
+            trajectories[name].append(getattr(model, method)())
+    return {"engine": job["engine"], "trajectories": trajectories}
+
+
+def confidence_interval(values):
+    """Mean and half-width of the 95% confidence interval of the mean."""
+    values = np.asarray(values, dtype=np.float64)
+    return values.mean(), 1.96 * values.std(ddof=1) / math.sqrt(len(values))
+
+
+def compare(runs=20, steps=25, seed=0, adults=True, width=20, height=20, dogs=60, humans=30, workers=None):
+    """Run both engines on the same runs seeds; return their per-step trajectories.
+
+    Returns {engine: {"trajectories": {metric: array of shape (runs, steps)}}}.
+    """
+    seeds = [int(s.generate_state(1)[0]) for s in np.random.SeedSequence(seed).spawn(runs)]
+    jobs = [dict(engine=engine, seed=run, steps=steps, adults=adults, width=width, height=height, dogs=dogs,
+                 humans=humans) for engine in ENGINES for run in seeds]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        results = list(pool.map(run_engine, jobs))
+
+    comparison = {}
+    for engine in ENGINES:
+        mine = [result for result in results if result["engine"] == engine]
+        comparison[engine] = {
+            "trajectories": {name: np.array([result["trajectories"][name] for result in mine]) for name, _ in METRICS},
+        }
+    return comparison
+
+
+def format_comparison(comparison, every=10):
+    """Mean ± 95% CI of every metric for both engines every few steps, and the largest gap between them.
+
+    The gap is the difference of the means in units of its standard error; gaps
+    well above 2 at many steps point to a real difference between the engines.
+    """
+    agents, vectorized = (comparison[engine]["trajectories"] for engine in ENGINES)
+    lines = []
+    for name, _ in METRICS:
+        a, v = agents[name], vectorized[name]
+        lines.append(f"{name}: {'step':>5} {'agents':>16} {'vectorized':>16}")
+        for step in range(every - 1, a.shape[1], every):
+            cells = " ".join("{:.1f} ± {:.1f}".format(*confidence_interval(x[:, step])).rjust(16) for x in (a, v))
+            lines.append(f"{'':{len(name) + 1}} {step + 1:5d} {cells}")
+        se = np.sqrt(a.var(axis=0, ddof=1) / len(a) + v.var(axis=0, ddof=1) / len(v))
+        gaps = np.abs(a.mean(axis=0) - v.mean(axis=0)) / np.where(se > 0, se, math.inf)
+        lines.append(f"{'':{len(name) + 1}} largest gap {gaps.max():.2f} standard errors (step {gaps.argmax() + 1}), "
+                     f"{(gaps > 2).mean():.0%} of steps above 2")
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare the mean dog trajectories of the agent and vectorized engines")
+    parser.add_argument("--runs", type=int, default=20, help="Seeds per engine (default: 20)")
+    parser.add_argument("--steps", type=int, default=25,
+                        help="Steps per run; unfed dogs starve after 20 steps (default: 25)")
+    parser.add_argument("--width", type=int, default=20, help="Grid width")
+    parser.add_argument("--height", type=int, default=20, help="Grid height")
+    parser.add_argument("--dog_population_size", type=int, default=60, help="Initial dog population")
+    parser.add_argument("--human_population_size", type=int, default=30, help="Initial human population")
+    parser.add_argument("--puppies", action="store_true",
+                        help="Keep the initial ages of 0-13 days instead of adults, so nobody breeds")
+    parser.add_argument("--every", type=int, default=5, help="Steps between printed rows (default: 5)")
+    parser.add_argument("--seed", type=int, default=0, help="Seed the run seeds are spawned from (default: 0)")
+    parser.add_argument("--workers", type=int, default=None, help="Processes (default: one per CPU)")
+    args = parser.parse_args()
+
+    comparison = compare(args.runs, args.steps, args.seed, not args.puppies, args.width, args.height,
+                         args.dog_population_size, args.human_population_size, args.workers)
+    print(format_comparison(comparison, args.every))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,10 @@
 import mesa
 import random
 import math
+import numpy as np
+from itertools import compress
 from agents import Dog, Human  # Assuming Dog and Human classes are in dog.py
+from population import DogPopulation
 from mesa.datacollection import DataCollector
 from reinforcement_learning import RLAgent
 import time
@@ -11,7 +14,7 @@ import os
 class DogHumanModel(mesa.Model):
     """A model to simulate interactions between dogs and humans."""
     
-    def __init__(self, width, height, num_dogs, num_humans, num_of_episodes, neutering_rate, vaccination_rate, weekly_kill_rate, initial_money, seed=None):
+    def __init__(self, width, height, num_dogs, num_humans, num_of_episodes, neutering_rate, vaccination_rate, weekly_kill_rate, initial_money, seed=None, vectorized=False):
         # Set up the grid
         super().__init__(seed=seed)
         self.grid = mesa.space.MultiGrid(width, height, torus=True)
@@ -48,9 +51,11 @@ class DogHumanModel(mesa.Model):
         self.reward = 0
         self.rate_rewards = []  # To store rates and their rewards
 
+        # With vectorized=True dogs live in NumPy arrays instead of Dog agents
+        self.dog_population = DogPopulation(width, height, np.random.default_rng(seed)) if vectorized else None
 
         # Create dogs
-        for i in range(num_dogs):
+        for i in range(0 if vectorized else num_dogs):
 
             self.random = random.random()
             age = random.randint(0, 13)
@@ -72,6 +77,9 @@ class DogHumanModel(mesa.Model):
             # self.agents.add(dog)  # Add dog to the agent set
             self.grid.place_agent(dog, (x, y))
 
+        if vectorized:
+            self.dog_population.spawn(num_dogs)
+
         # Create humans
         for i in range(num_humans):
             age = random.randint(20, 60)
@@ -246,7 +254,18 @@ class DogHumanModel(mesa.Model):
             self.apply_action(action)
 
             """Advance the model by one step."""
-            self.agents.shuffle_do("step")  # Shuffle and step through agents in random order
+            if self.dog_population is None:
+                self.agents.shuffle_do("step")  # Shuffle and step through agents in random order
+            else:
+                # Humans meet the dogs between acting and their mortality check, like in Human.step
+                humans = self.agents_by_type.get(Human)
+                if humans:
+                    humans.shuffle_do("act")
+                humans = list(humans or [])
+                dying = np.array([human.dies() for human in humans], dtype=bool)
+                self.dog_population.step(self, humans, dying)
+                for human in compress(humans, dying):
+                    human.remove()
 
             # Evaluate the reward based on the new system state
             self.reward = self.get_reward()
@@ -368,12 +387,18 @@ class DogHumanModel(mesa.Model):
         return self.grid.get_agents_at(position)
     
     def return_the_dog_agents(self):
+        if self.dog_population is not None:
+            return len(self.dog_population)
         return len([agent for agent in self.agents if isinstance(agent, Dog)])
     
     def return_the_rabid_dog_agents(self):
+        if self.dog_population is not None:
+            return self.dog_population.count_rabid()
         return len([agent for agent in self.agents if isinstance(agent,Dog) and agent.rabid==True])
     
     def return_the_vaccinated_dog_agents(self):
+        if self.dog_population is not None:
+            return self.dog_population.count_vaccinated()
         return len([agent for agent in self.agents if isinstance(agent, Dog) and agent.vaccinated==True])
     
     def get_neutering_rate(self):
@@ -403,6 +428,11 @@ class DogHumanModel(mesa.Model):
         
         self.remove_all_agents()
 
+        if self.dog_population is not None:
+            self.dog_population.clear()
+            self.dog_population.spawn(self.num_dogs)
+            return
+
         # Create s
         for i in range(self.num_dogs):
 
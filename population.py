@@ -0,0 +1,461 @@
+import numpy as np
+
+SEASONS = ["Spring", "Summer", "Fall", "Winter"]
+SEASON_HUNGER = np.array([-5, -15, 7, 15], dtype=np.float32)  # Spring, Summer, Fall, Winter
+SEASON_AGGRESSION = np.array([0.05, 0.1, -0.05, -0.1], dtype=np.float32)
+
+SEX_M, SEX_F = 0, 1
+HEALTHY, SICK, INJURED = 0, 1, 2
+
+MOVES = np.array([(1, 0), (-1, 0), (0, -1), (0, 1)])  # Right, left, up, down
+
+
+def moore_offsets(width, height, radius):
+    """Return the unique torus offsets of a Moore neighborhood, without the center cell."""
+    offsets = set()
+    for dx in range(-radius, radius + 1):
+        for dy in range(-radius, radius + 1):
+            offset = (dx % width, dy % height)
+            if offset != (0, 0):
+                offsets.add(offset)
+    return sorted(offsets)
+
+
+def neighbor_cells(x, y, width, height, radius=1):
+    """Yield the flat cells (``x * height + y``) of the Moore neighborhood of every point, one offset at a time.
+
+    Like ``MultiGrid.get_neighbors(include_center=False)`` the point's own cell is excluded.
+    """
+    for dx, dy in moore_offsets(width, height, radius):
+        yield ((x + dx) % width) * height + (y + dy) % height
+
+
+def neighbor_counts(src_x, src_y, dst_x, dst_y, width, height, radius=1):
+    """Return the number of dsts in the Moore neighborhood of every src, from one count per grid cell."""
+    per_cell = np.bincount(dst_x * height + dst_y, minlength=width * height)
+    counts = np.zeros(len(src_x), dtype=np.int64)
+    for cells in neighbor_cells(src_x, src_y, width, height, radius):
+        counts += per_cell[cells]
+    return counts
+
+
+def neighbor_counts_above(src_x, src_y, src_values, dst_x, dst_y, dst_values, width, height, radius=1):
+    """Return the number of dsts in the Moore neighborhood of every src with a larger value than the src.
+
+    The dsts are sorted by cell and then by the rank of their value, so each
+    count is the difference of two binary searches.
+    """
+    counts = np.zeros(len(src_x), dtype=np.int64)
+    if len(src_x) == 0 or len(dst_x) == 0:
+        return counts
+    levels = np.unique(dst_values)
+    rank = np.searchsorted(levels, src_values, side="right")  # Dst levels at or below each src value
+    keys = np.sort((dst_x.astype(np.int64) * height + dst_y) * len(levels) + np.searchsorted(levels, dst_values))
+    for cells in neighbor_cells(src_x.astype(np.int64), src_y, width, height, radius):
+        counts += (np.searchsorted(keys, (cells + 1) * len(levels))
+                   - np.searchsorted(keys, cells * len(levels) + rank))
+    return counts
+
+
+def neighbor_pairs(src_x, src_y, dst_x, dst_y, width, height, radius=1, chunk=1 << 20):
+    """Yield index arrays (i, j) such that dst j is in the Moore neighborhood of src i.
+
+    Like ``MultiGrid.get_neighbors(include_center=False)`` the source's own cell
+    is excluded. The pairs come in chunks of consecutive sources with about
+    ``chunk`` pairs each (a source with more neighbors makes a chunk of its
+    own), so memory stays bounded however crowded the cells are.
+    """
+    if len(src_x) == 0:
+        return
+    dst_cells = dst_x * height + dst_y
+    order = np.argsort(dst_cells, kind="stable")
+    sorted_cells = dst_cells[order]
+
+    # Where the dsts of every neighboring cell of every source start in order, and how many there are
+    cells = np.array(list(neighbor_cells(src_x, src_y, width, height, radius))).reshape(-1, len(src_x))
+    lo = np.searchsorted(sorted_cells, cells, side="left")
+    counts = np.searchsorted(sorted_cells, cells, side="right") - lo
+    bounds = np.concatenate([[0], np.cumsum(counts.sum(axis=0))])
+
+    start = 0
+    while start < len(src_x):
+        end = max(np.searchsorted(bounds, bounds[start] + chunk, side="right") - 1, start + 1)
+        chunk_lo, chunk_counts = lo[:, start:end].ravel(), counts[:, start:end].ravel()
+        total = chunk_counts.sum()
+        if total:
+            starts = np.repeat(chunk_lo - (np.cumsum(chunk_counts) - chunk_counts), chunk_counts)
+            sources = np.tile(np.arange(start, end), len(cells))
+            yield np.repeat(sources, chunk_counts), order[starts + np.arange(total)]
+        start = end
+
+
+def neighbor_counts_present(src_x, src_y, src_times, dst_x, dst_y, dst_arrivals, dst_departures, width, height,
+                            radius=1):
+    """Return the number of dsts in the Moore neighborhood of every src that are there at the src's time.
+
+    A dst is there from its arrival up to, but not including, its departure;
+    times beyond [0, 1] are clipped to it. Arrivals and departures are sorted
+    by cell and then by time, so each count is the difference of two binary
+    searches.
+    """
+    counts = np.zeros(len(src_x), dtype=np.int64)
+    if len(src_x) == 0 or len(dst_x) == 0:
+        return counts
+    dst_cells = 2 * (dst_x.astype(np.int64) * height + dst_y)
+    arrivals = np.sort(dst_cells + np.clip(dst_arrivals, 0, 1))
+    departures = np.sort(dst_cells + np.clip(dst_departures, 0, 1))
+    for cells in neighbor_cells(src_x.astype(np.int64), src_y, width, height, radius):
+        keys = 2 * cells + src_times
+        counts += np.searchsorted(arrivals, keys, side="right") - np.searchsorted(departures, keys, side="right")
+    return counts
+
+
+class DogPopulation:
+    """Struct-of-arrays dog population, stepped with batched NumPy operations.
+
+    Mirrors ``Dog.step`` for every dog at once: ageing, seasons, hunger, lifespan,
+    reproduction, movement, interactions, interventions and pack formation.
+    The agent model steps its dogs one at a time in random order, so here too
+    every dog gets a turn in the step: dogs dying or adopted in it are still
+    there for the dogs and humans acting before they leave, and puppies born
+    in it are there from their parent's turn on. Where only counts are needed,
+    such a dog meets each other one half of the time. Puppies keep age 0 until
+    the next step and, like ``Dog`` agents born during a step, are only acted
+    on in it: they do not move, bite or get sterilized or vaccinated yet.
+    """
+
+    FIELDS = {
+        "age": np.int32,
+        "sex": np.int8,
+        "rabid": np.bool_,
+        "sterilized": np.bool_,
+        "vaccinated": np.bool_,
+        "adoptability": np.float32,
+        "bred": np.bool_,
+        "health": np.int8,
+        "active": np.bool_,  # Reproductive status
+        "aggression": np.float32,
+        "hunger": np.float32,
+        "x": np.int32,
+        "y": np.int32,
+        "location_x": np.int32,  # Where the dog was born; distances to humans are measured from here
+        "location_y": np.int32,
+        "pack_id": np.int32,  # -1 when not in a pack
+        "center_x": np.float32,  # Territory center of the pack
+        "center_y": np.float32,
+        "day_count": np.int32,
+        "season": np.int8,
+    }
+
+    def __init__(self, width, height, rng=None):
+        self.width = width
+        self.height = height
+        self.rng = rng if rng is not None else np.random.default_rng()
+        self.next_pack_id = 0
+        self.clear()
+
+    def __len__(self):
+        return len(self.age)
+
+    def clear(self):
+        """Remove every dog."""
+        for name, dtype in self.FIELDS.items():
+            setattr(self, name, np.empty(0, dtype=dtype))
+
+    def spawn(self, n):
+        """Add n dogs drawn from the same distributions as the initial ``Dog`` agents."""
+        rng = self.rng
+        self.append(
+            age=rng.integers(0, 14, n),
+            sex=rng.integers(0, 2, n),
+            rabid=rng.random(n) < 0.5,
+            sterilized=rng.random(n) < 0.5,
+            vaccinated=rng.random(n) < 0.5,
+            adoptability=rng.random(n),
+            bred=rng.random(n) < 0.5,
+            health=np.where(rng.random(n) < 0.5, HEALTHY, SICK),
+            active=rng.random(n) < 0.5,
+            aggression=rng.integers(0, 2, n),
+            x=rng.integers(0, self.width, n),
+            y=rng.integers(0, self.height, n),
+        )
+
+    def append(self, **values):
+        """Append dogs; fields not given take the defaults of a fresh ``Dog``, born where they are."""
+        n = len(values["x"])
+        defaults = {"pack_id": -1, "center_x": np.nan, "center_y": np.nan, "location_x": values["x"],
+                    "location_y": values["y"]}
+        for name, dtype in self.FIELDS.items():
+            column = values.get(name, defaults.get(name, 0))
+            column = np.broadcast_to(np.asarray(column, dtype=dtype), (n,))
+            setattr(self, name, np.concatenate([getattr(self, name), column]))
+
+    def keep(self, mask):
+        """Drop every dog where mask is False."""
+        for name in self.FIELDS:
+            setattr(self, name, getattr(self, name)[mask])
+
+    def count_rabid(self):
+        return int(self.rabid.sum())
+
+    def count_vaccinated(self):
+        return int(self.vaccinated.sum())
+
+    def step(self, model, humans, dying=None):
+        """Advance every dog by one step; ``dying`` marks the humans that die at the end of it."""
+        if len(self) == 0:
+            return
+
+        self.age += 1
+        self.day_count += 1
+
+        # Change the season every 100 days
+        season_change = self.day_count % 100 == 0
+        self.season[season_change] = (self.season[season_change] + 1) % 4
+        self.hunger[season_change] += SEASON_HUNGER[self.season[season_change]]
+        self.aggression[season_change] += SEASON_AGGRESSION[self.season[season_change]]
+
+        self.hunger += 10
+        self.active |= self.age >= 730
+
+        n = len(self)
+        turn = self.rng.random(n)
+        hungry = self.hunger >= 200
+        died, checks_injury = self.lifespan_deaths()
+        leaving = hungry | died
+        exposed = checks_injury & ~leaving & (self.health != INJURED)  # Dies of injuries from before its turn
+
+        adopted = self.meet_humans(humans, leaving, np.arange(n))
+        parents = self.reproduce(leaving, adopted)
+        puppies = np.arange(n, len(self))
+        leaving, exposed = (np.append(mask, np.zeros(len(puppies), dtype=bool)) for mask in (leaving, exposed))
+        adopted = np.append(adopted, self.meet_humans(humans, leaving, puppies))
+
+        # Puppies arrive at their parent's turn; dying dogs leave at their own turn and adopted ones
+        # at the turn of a human coming before that
+        arrival = np.append(np.zeros(n), turn[parents])
+        turn = np.append(turn, turn[parents])
+        departure = np.where(leaving, turn, 2.0)
+        until = np.minimum(departure[adopted], 1.0)
+        departure[adopted] = arrival[adopted] + (until - arrival[adopted]) * self.rng.random(len(until))
+        acting = (self.age > 0) & (turn < departure)  # Dogs that take their turn
+
+        packed = (self.pack_id >= 0) | self.form_packs(turn, arrival, departure, acting)
+        self.move(acting, packed)
+        self.bite_humans(humans, dying, acting)
+        wounded = self.interact_with_dogs(acting, ~acting | adopted, exposed & acting)
+
+        # Apply neutering and vaccination rates weekly to the dogs that took their turn
+        acting &= ~wounded
+        self.sterilized |= acting & (self.rng.random(len(self)) < model.neutering_rate)
+        self.vaccinated |= acting & (self.rng.random(len(self)) < model.vaccination_rate)
+
+        self.keep(~leaving & ~adopted & ~wounded)
+
+    def lifespan_deaths(self):
+        """Return the mask of dogs dying this step, following ``Dog.check_lifespan``, and the mask
+        of dogs whose check gets as far as the injury mortality."""
+        n = len(self)
+        u = self.rng.random(n)
+        age = self.age
+        max_age = self.rng.integers(3600, 5401, n)
+
+        conditions = [
+            age <= 120,
+            age <= 240,
+            age > max_age,
+            age > 1800,
+            (self.season == 3) & (self.hunger > 150),
+            self.rabid & (u < 0.3),
+            self.health == INJURED,
+        ]
+        outcomes = [u < 0.4, u < 0.8, True, u < 0.2, u < 0.5, True, self.rng.random(n) < 0.2]
+        return np.select(conditions, outcomes, default=False), ~np.any(conditions[:-1], axis=0)
+
+    def reproduce(self, leaving, adopted):
+        """Every fertile dog may breed with each active dog of the other sex next to it (50% chance each).
+
+        Dogs leaving in this step only breed, or are met, before they leave.
+        Returns the parent of every puppy.
+        """
+        fertile = np.flatnonzero((self.age >= 730) & ~self.sterilized & self.active & ~leaving)
+        if len(fertile) == 0:
+            return fertile
+
+        # Active dogs of either sex around every fertile dog, counted per cell, apart for those leaving
+        x, y = self.x[fertile], self.y[fertile]
+        mates, passing = [], []
+        for sex in (SEX_M, SEX_F):
+            for counts, there in ((mates, ~leaving & ~adopted), (passing, leaving | adopted)):
+                active = self.active & (self.sex == sex) & there
+                counts.append(neighbor_counts(x, y, self.x[active], self.y[active], self.width, self.height))
+        male = self.sex[fertile] == SEX_M
+        mates = np.where(male, mates[SEX_F], mates[SEX_M])
+        passing = np.where(male, passing[SEX_F], passing[SEX_M])
+        chance = np.where(adopted[fertile], 0.25, 0.5)
+        matings = self.rng.binomial(mates, chance) + self.rng.binomial(passing, chance / 2)
+        parents = np.repeat(fertile, matings)  # One puppy per successful mating
+
+        n = len(parents)
+        if n:
+            self.append(
+                sex=self.rng.integers(0, 2, n),
+                rabid=self.rng.random(n) < 0.5,
+                adoptability=self.rng.random(n),
+                aggression=self.rng.random(n),
+                x=self.x[parents],
+                y=self.y[parents],
+                day_count=self.day_count[parents],
+            )
+        return parents
+
+    def move(self, acting, packed):
+        """Move with the pack (70% chance when in one) or randomly to an adjacent cell."""
+        n = len(self)
+        in_pack = acting & packed & (self.rng.random(n) < 0.7)
+
+        # Random moves; dogs older than 5 years only move half of the time
+        moving = acting & ~in_pack & ((self.age <= 1800) | (self.rng.random(n) < 0.5))
+        step = MOVES[self.rng.integers(0, 4, n)]
+        self.x = np.where(moving, (self.x + step[:, 0]) % self.width, self.x).astype(np.int32)
+        self.y = np.where(moving, (self.y + step[:, 1]) % self.height, self.y).astype(np.int32)
+
+        # Pack moves towards the territory center, at most one cell per axis
+        dx = self.center_x[in_pack] - self.x[in_pack]
+        dy = self.center_y[in_pack] - self.y[in_pack]
+        dx = np.where(np.abs(dx) > 1, np.sign(dx), dx)
+        dy = np.where(np.abs(dy) > 1, np.sign(dy), dy)
+        self.x[in_pack] = np.round((self.x[in_pack] + dx) % self.width) % self.width
+        self.y[in_pack] = np.round((self.y[in_pack] + dy) % self.height) % self.height
+
+    def meet_humans(self, humans, leaving, dogs):
+        """Humans with a good attitude adopt adjacent adoptable dogs among ``dogs``, otherwise feed sick ones.
+
+        Dogs leaving in this step and puppies are only met half of the time.
+        Returns the mask of adopted dogs among ``dogs``.
+        """
+        adopted = np.zeros(len(self), dtype=bool)
+        if not humans or len(dogs) == 0:
+            return adopted[dogs]
+
+        human_x = np.array([human.pos[0] for human in humans])
+        human_y = np.array([human.pos[1] for human in humans])
+        attitude = np.array([human.attitude_towards_dogs for human in humans])
+
+        fed = np.zeros(len(self), dtype=np.int64)
+        for human_idx, dog_idx in neighbor_pairs(human_x, human_y, self.x[dogs], self.y[dogs], self.width,
+                                                 self.height):
+            dog_idx = dogs[dog_idx]
+            there = ~leaving[dog_idx] & (self.age[dog_idx] > 0) | (self.rng.random(len(dog_idx)) < 0.5)
+            adopt = there & (self.adoptability[dog_idx] > 0.5) & (attitude[human_idx] > 0.7)
+            feed = there & ~adopt & (self.health[dog_idx] == SICK)
+            fed += np.bincount(dog_idx[feed], minlength=len(self))
+            adopted[dog_idx[adopt]] = True
+
+        self.hunger -= 30 * fed
+        self.aggression -= 20 * fed
+        return adopted[dogs]
+
+    def bite_humans(self, humans, dying, acting):
+        """Rabid dogs taking their turn may infect adjacent humans; humans dying in this step are only met
+        half of the time."""
+        if not humans:
+            return
+        if dying is None:
+            dying = np.zeros(len(humans), dtype=bool)
+
+        human_x = np.array([human.pos[0] for human in humans])
+        human_y = np.array([human.pos[1] for human in humans])
+        home_x = np.array([human.location[0] for human in humans])
+        home_y = np.array([human.location[1] for human in humans])
+
+        dogs = np.flatnonzero(acting)
+        for human_idx, dog_idx in neighbor_pairs(human_x, human_y, self.x[dogs], self.y[dogs], self.width,
+                                                 self.height):
+            dog_idx = dogs[dog_idx]
+            # Like Dog.interact_with_human, only a dog born within distance 5 of the human's home
+            # may infect it (5% chance when rabid)
+            n = len(dog_idx)
+            near = ((np.hypot(self.location_x[dog_idx] - home_x[human_idx],
+                              self.location_y[dog_idx] - home_y[human_idx]) < 5)
+                    & (~dying[human_idx] | (self.rng.random(n) < 0.5)))
+            infected = human_idx[near & self.rabid[dog_idx] & (self.rng.random(n) < 0.05)]
+            for h in np.unique(infected):
+                humans[h].get_rabies()
+
+    def interact_with_dogs(self, acting, passing, exposed):
+        """A more aggressive dog taking its turn has a 30% chance to injure each neighboring dog.
+
+        Passing dogs, there for only some of the turns, are met half of the
+        time. Exposed dogs bitten before their own turn may die of it then
+        (20%); returns the mask of those dogs.
+        """
+        aggressors = neighbor_counts_above(self.x, self.y, self.aggression, self.x[acting], self.y[acting],
+                                           self.aggression[acting], self.width, self.height)
+        bites = self.rng.binomial(aggressors, np.where(passing, 0.15, 0.3))
+        self.health[bites > 0] = INJURED
+        # With k bites, one of them comes before the dog's turn with probability k / (k + 1)
+        return exposed & (self.rng.random(len(self)) < 0.2 * bites / (bites + 1))
+
+    def form_packs(self, turn, arrival, departure, acting):
+        """Group loose dogs into packs like ``Dog.check_pack_behavior`` does in every dog's turn;
+        return the mask of dogs that joined a pack before their own turn.
+
+        At the end of its turn a loose dog with at least two loose dogs there
+        within radius 2 (outside its own cell) forms a pack with all of them.
+        The turns are replayed in rounds: a seed forms its pack as soon as no
+        seed with an earlier turn within radius 4 could take its candidates
+        first, which gives the packs of the sequential pass.
+        """
+        joined = np.zeros(len(self), dtype=bool)
+        loose = np.flatnonzero(self.pack_id < 0)
+        if len(loose) < 3:
+            return joined
+
+        x, y = self.x[loose], self.y[loose]
+        cells = x * self.height + y
+        turn, arrival, departure, acting = turn[loose], arrival[loose], departure[loose], acting[loose]
+        leader = np.full(len(loose), -1)
+        while True:
+            free = np.flatnonzero(leader < 0)
+            candidates = free[acting[free]]
+            counts = neighbor_counts_present(x[candidates], y[candidates], turn[candidates], x[free], y[free],
+                                             arrival[free], departure[free], self.width, self.height, radius=2)
+            seeds = candidates[counts >= 2]
+            if len(seeds) == 0:
+                break
+
+            # Seeds that come first among the seeds of every cell within radius 4
+            cell_turn = np.full(self.width * self.height, np.inf)
+            np.minimum.at(cell_turn, cells[seeds], turn[seeds])
+            first = cell_turn[cells[seeds]]
+            for around in neighbor_cells(x[seeds], y[seeds], self.width, self.height, radius=4):
+                np.minimum(first, cell_turn[around], out=first)
+            ready = seeds[turn[seeds] == first]
+
+            # They are at least 5 cells apart, so every free dog there around one of them joins that one
+            cell_seed = np.full(self.width * self.height, -1)
+            cell_seed[cells[ready]] = ready
+            leader[ready] = ready
+            for around in neighbor_cells(x[free], y[free], self.width, self.height, radius=2):
+                seed = cell_seed[around]
+                joins = seed >= 0
+                seed_turn = turn[seed[joins]]
+                joins[joins] = (arrival[free[joins]] <= seed_turn) & (seed_turn < departure[free[joins]])
+                leader[free[joins]] = seed[joins]
+
+        members = leader >= 0
+        if not members.any():
+            return joined
+        leaders, pack_index = np.unique(leader[members], return_inverse=True)
+        size = np.bincount(pack_index)
+        center_x = np.bincount(pack_index, weights=self.x[loose[members]]) / size
+        center_y = np.bincount(pack_index, weights=self.y[loose[members]]) / size
+
+        dogs = loose[members]
+        self.pack_id[dogs] = self.next_pack_id + pack_index
+        self.center_x[dogs] = center_x[pack_index]
+        self.center_y[dogs] = center_y[pack_index]
+        self.next_pack_id += len(leaders)
+        joined[dogs] = turn[members] > turn[leader[members]]
+        return joined